@@ -1,11 +1,26 @@
+import glob
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date
+from typing import Optional
+
 from fastapi import FastAPI, Header, HTTPException, Depends
 import duckdb
-import psycopg2
 from fastapi.middleware.cors import CORSMiddleware
 
 
 # --- DB CONFIG ---
-DUCKDB_PATH = "warehouse.duckdb"
+DUCKDB_PATH = os.environ.get("DUCKDB_PATH", "warehouse.duckdb")
+
+# Directories (os.pathsep-separated) holding fact_YYYY_MM.duckdb shards written
+# by load_to_warehouse.py --shard-dir. When set, DUCKDB_PATH is not used.
+WAREHOUSE_SHARD_DIRS = [d for d in os.environ.get("WAREHOUSE_SHARD_DIR", "").split(os.pathsep) if d]
+
+# "postgres" (default) or "sqlite:<path>" for a local stand-in of users/tenants.
+USER_STORE = os.environ.get("USER_STORE", "postgres")
 
 PG_CONFIG = {
     "host": "postgres",
@@ -28,6 +43,9 @@ app.add_middleware(
 
 # --- Connections ---
 def get_pg_conn():
+    # Imported lazily so the API can run against a non-Postgres user store.
+    import psycopg2
+
     return psycopg2.connect(**PG_CONFIG)
 
 
@@ -35,17 +53,288 @@ def get_duck_conn():
     return duckdb.connect(DUCKDB_PATH, read_only=True)
 
 
+# --- Warehouse queries ---
+SHARD_RE = re.compile(r"^fact_(\d{4})_(\d{2})\.duckdb$")
+UNDATED_SHARD = "fact_undated.duckdb"
+
+
+def list_shards() -> list:
+    """[(path, month start or None for undated rows)] across WAREHOUSE_SHARD_DIRS.
+
+    A shard file present in several directories is taken from the first one.
+    """
+    shards = {}
+    for shard_dir in WAREHOUSE_SHARD_DIRS:
+        for path in sorted(glob.glob(os.path.join(shard_dir, "fact_*.duckdb"))):
+            name = os.path.basename(path)
+            if name in shards:
+                continue
+            if name == UNDATED_SHARD:
+                shards[name] = (path, None)
+                continue
+            m = SHARD_RE.match(name)
+            if m:
+                shards[name] = (path, date(int(m.group(1)), int(m.group(2)), 1))
+    return list(shards.values())
+
+
+def month_shard_path(year: int, month: int) -> Optional[str]:
+    """The first WAREHOUSE_SHARD_DIRS entry holding this month's shard, if any."""
+    name = f"fact_{year:04d}_{month:02d}.duckdb"
+    for shard_dir in WAREHOUSE_SHARD_DIRS:
+        path = os.path.join(shard_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def shards_for_range(start: Optional[date], end: Optional[date]) -> list:
+    """Shard paths whose month overlaps [start, end]; undated rows only when unbounded.
+
+    A fully bounded range looks up only its own months by name, so directories
+    holding other months (e.g. older shards moved to cheaper storage) are not listed.
+    """
+    if start is not None and end is not None:
+        paths = []
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            path = month_shard_path(year, month)
+            if path:
+                paths.append(path)
+            year, month = year + month // 12, month % 12 + 1
+        return paths
+
+    paths = []
+    for path, month_start in list_shards():
+        if month_start is None:
+            if start is None and end is None:
+                paths.append(path)
+            continue
+        month_end = date(month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1)
+        if (end is None or month_start <= end) and (start is None or month_end > start):
+            paths.append(path)
+    return paths
+
+
+class ShardAttachments:
+    """Shards attached read-only, on demand, to one shared in-memory DuckDB.
+
+    Each shard path is attached the first time a query needs it and stays
+    attached while its mtime is unchanged, so requests skip the ATTACH and
+    shards outside every queried range are never opened. A rewritten or
+    vanished shard's alias is retired and detached once no request uses it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.con = None
+        self.attached = {}  # path -> (alias, mtime_ns)
+        self.in_use = Counter()  # alias -> requests currently querying it
+        self.retired = set()
+        self.next_alias = 0
+
+    def acquire(self, paths: list):
+        """Return (cursor, {path: alias}) for `paths`; release() the aliases afterwards.
+
+        Raises FileNotFoundError if one of `paths` no longer exists.
+        """
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                self.forget(path)
+                raise
+
+        with self.lock:
+            if self.con is None:
+                self.con = duckdb.connect()
+            for path, mtime in mtimes.items():
+                current = self.attached.get(path)
+                if current is not None and current[1] == mtime:
+                    continue
+                if current is not None:
+                    self.retired.add(current[0])
+                alias = f"s{self.next_alias}"
+                self.next_alias += 1
+                quoted = path.replace("'", "''")
+                try:
+                    self.con.execute(f"ATTACH '{quoted}' AS {alias} (READ_ONLY)")
+                except duckdb.IOException as e:
+                    self.attached.pop(path, None)
+                    raise FileNotFoundError(path) from e
+                self.attached[path] = (alias, mtime)
+
+            aliases = {path: self.attached[path][0] for path in paths}
+            self.in_use.update(aliases.values())
+            self._detach_retired()
+            return self.con.cursor(), aliases
+
+    def release(self, aliases: dict) -> None:
+        with self.lock:
+            self.in_use.subtract(aliases.values())
+            self._detach_retired()
+
+    def forget(self, path: str) -> None:
+        with self.lock:
+            current = self.attached.pop(path, None)
+            if current is not None:
+                self.retired.add(current[0])
+                self._detach_retired()
+
+    def _detach_retired(self) -> None:
+        for alias in [a for a in self.retired if self.in_use[a] <= 0]:
+            self.con.execute(f"DETACH {alias}")
+            self.retired.discard(alias)
+            del self.in_use[alias]
+
+
+_shard_attachments = ShardAttachments()
+
+
+def date_key_filter(start: Optional[date], end: Optional[date]) -> str:
+    clauses = []
+    if start is not None:
+        clauses.append(f"date_key >= {int(start.strftime('%Y%m%d'))}")
+    if end is not None:
+        clauses.append(f"date_key <= {int(end.strftime('%Y%m%d'))}")
+    return ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+
+def union_parts(parts: list) -> str:
+    return " UNION ALL ".join(f"({p})" for p in parts)
+
+
+def query_shards(partial_sql: str, combine_sql: str, start: Optional[date], end: Optional[date]):
+    where = date_key_filter(start, end)
+    # A shard moved between directories mid-request is found again on a rescan.
+    for attempt in range(2):
+        paths = shards_for_range(start, end)
+        if not paths:
+            if not list_shards():
+                raise HTTPException(status_code=503, detail="No warehouse shards found in WAREHOUSE_SHARD_DIR")
+            return []
+        try:
+            con, aliases = _shard_attachments.acquire(paths)
+            break
+        except FileNotFoundError:
+            if attempt:
+                raise HTTPException(status_code=503, detail="Warehouse shards changed during the request")
+
+    try:
+        parts = [
+            partial_sql.format(fact=f"{aliases[p]}.fact_transactions", dim_date=f"{aliases[p]}.dim_date", where=where)
+            for p in paths
+        ]
+        return con.execute(combine_sql.format(parts=union_parts(parts))).fetchall()
+    finally:
+        con.close()
+        _shard_attachments.release(aliases)
+
+
+def query_fact(partial_sql: str, combine_sql: str, start: Optional[date], end: Optional[date]):
+    """Run `partial_sql` per warehouse source and merge the partials with `combine_sql`.
+
+    `partial_sql` uses {fact}, {dim_date} and {where}; `combine_sql` selects from
+    {parts}, the UNION ALL of the partial aggregates. Sharded warehouses query
+    only the shards overlapping [start, end].
+    """
+    if WAREHOUSE_SHARD_DIRS:
+        return query_shards(partial_sql, combine_sql, start, end)
+
+    con = get_duck_conn()
+    where = date_key_filter(start, end)
+    parts = [partial_sql.format(fact="fact_transactions", dim_date="dim_date", where=where)]
+    data = con.execute(combine_sql.format(parts=union_parts(parts))).fetchall()
+    con.close()
+    return data
+
+
+# --- User store ---
+class PostgresUserStore:
+    """users/tenants tables in the Postgres service."""
+
+    def get_user(self, username: str):
+        conn = get_pg_conn()
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT username, role, tenant_id FROM users WHERE username = %s",
+            (username,)
+        )
+        row = cur.fetchone()
+        cur.close()
+        conn.close()
+        return row
+
+    def list_users(self):
+        conn = get_pg_conn()
+        cur = conn.cursor()
+        cur.execute("SELECT username, role, tenant_id FROM users")
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+        return rows
+
+
+class SqliteUserStore:
+    """Same users/tenants schema in a SQLite file, for local runs and load tests."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def create_schema(self) -> None:
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tenants (
+                tenant_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS users (
+                username TEXT PRIMARY KEY,
+                role TEXT NOT NULL,
+                tenant_id INTEGER REFERENCES tenants(tenant_id)
+            );
+        """)
+        conn.commit()
+        conn.close()
+
+    def get_user(self, username: str):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT username, role, tenant_id FROM users WHERE username = ?",
+            (username,)
+        ).fetchone()
+        conn.close()
+        return row
+
+    def list_users(self):
+        conn = self._connect()
+        rows = conn.execute("SELECT username, role, tenant_id FROM users").fetchall()
+        conn.close()
+        return rows
+
+
+def make_user_store(spec: str):
+    if spec == "postgres":
+        return PostgresUserStore()
+    if spec.startswith("sqlite:"):
+        return SqliteUserStore(spec[len("sqlite:"):])
+    raise ValueError(f"Unknown USER_STORE: {spec!r}")
+
+
+_user_store = make_user_store(USER_STORE)
+
+
+def get_user_store():
+    return _user_store
+
+
 # --- Auth / Role ---
-def get_current_user(x_user: str = Header(...)):
-    conn = get_pg_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT username, role, tenant_id FROM users WHERE username = %s",
-        (x_user,)
-    )
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+def get_current_user(x_user: str = Header(...), store=Depends(get_user_store)):
+    row = store.get_user(x_user)
 
     if not row:
         raise HTTPException(status_code=401, detail="Invalid user")
@@ -59,47 +348,70 @@ def get_current_user(x_user: str = Header(...)):
 
 # --- Endpoints ---
 @app.get("/metrics/revenue-by-country")
-def revenue_by_country(user=Depends(get_current_user)):
+def revenue_by_country(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user=Depends(get_current_user),
+):
     if user["role"] == "guest":
         raise HTTPException(status_code=403, detail="Guests not allowed")
 
-    con = get_duck_conn()
-    data = con.execute("""
+    data = query_fact(
+        """
         SELECT country, SUM(total_amount) AS revenue
-        FROM fact_transactions
+        FROM {fact}
+        {where}
+        GROUP BY country
+        """,
+        """
+        SELECT country, SUM(revenue) AS revenue
+        FROM ({parts})
         GROUP BY country
         ORDER BY revenue DESC
-    """).fetchall()
-    con.close()
+        """,
+        start,
+        end,
+    )
 
     return [{"country": r[0], "revenue": r[1]} for r in data]
 
 
 @app.get("/metrics/daily-revenue")
-def daily_revenue(user=Depends(get_current_user)):
-    con = get_duck_conn()
-    data = con.execute("""
-        SELECT order_date, SUM(total_amount) AS revenue
-        FROM fact_transactions
-        GROUP BY order_date
-        ORDER BY order_date
-    """).fetchall()
-    con.close()
+def daily_revenue(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user=Depends(get_current_user),
+):
+    data = query_fact(
+        """
+        SELECT d.date, f.revenue
+        FROM (
+            SELECT date_key, SUM(total_amount) AS revenue
+            FROM {fact}
+            {where}
+            GROUP BY date_key
+        ) f
+        JOIN {dim_date} d USING (date_key)
+        """,
+        """
+        SELECT date, SUM(revenue) AS revenue
+        FROM ({parts})
+        GROUP BY date
+        ORDER BY date
+        """,
+        start,
+        end,
+    )
 
     return [{"date": str(r[0]), "revenue": r[1]} for r in data]
 
 
 @app.get("/admin/users")
-def list_users(user=Depends(get_current_user)):
+def list_users(user=Depends(get_current_user), store=Depends(get_user_store)):
     if user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
 
-    conn = get_pg_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT username, role, tenant_id FROM users")
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+    rows = store.list_users()
 
     return [
         {"username": r[0], "role": r[1], "tenant_id": r[2]}
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import duckdb
+import pandas as pd
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SRC_DIR)
+
+STAGES = ["profile", "etl", "metrics", "load", "pipeline"]
+
+
+def script(name: str) -> str:
+    return os.path.join(SRC_DIR, name)
+
+
+def stage_command(stage: str, raw: str, work: str, canonical_maps: str) -> tuple:
+    """Return (argv, output paths) for one pipeline stage."""
+    clean = os.path.join(work, "clean.csv")
+    reject = os.path.join(work, "reject.csv")
+
+    if stage == "profile":
+        return [script("analyze_dataset.py"), "--path", raw], []
+    if stage == "etl":
+        argv = [
+            script("etl_clean.py"), "--input", raw, "--out-clean", clean, "--out-reject", reject,
+            "--canonical-maps", canonical_maps, "--no-resume",
+        ]
+        return argv, [clean, reject]
+    if stage == "metrics":
+        return [script("data_quality_metrics.py"), "--raw", raw, "--clean", clean, "--reject", reject], []
+    if stage == "load":
+        db = os.path.join(work, "warehouse.duckdb")
+        return [script("load_to_warehouse.py"), "--input", clean, "--db", db], [db]
+    if stage == "pipeline":
+        db = os.path.join(work, "pipeline.duckdb")
+        argv = [
+            script("pipeline.py"), "--input", raw,
+            "--out-clean", os.path.join(work, "pipeline_clean.csv"),
+            "--out-reject", os.path.join(work, "pipeline_reject.csv"),
+            "--db", db, "--canonical-maps", canonical_maps,
+        ]
+        return argv, [db, os.path.join(work, "pipeline_clean.csv"), os.path.join(work, "pipeline_reject.csv")]
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+# Runs a stage script as __main__ and, at exit, writes the process's own
+# VmHWM (peak RSS of this address space) to argv[1]. Unlike ru_maxrss, VmHWM
+# starts fresh at exec, so it is not floored at the benchmark process's peak.
+PEAK_RSS_WRAPPER = """
+import atexit, os, runpy, sys
+
+def _write_peak():
+    with open("/proc/self/status") as f:
+        kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    with open(out, "w") as f:
+        f.write(str(kb))
+
+out = sys.argv[1]
+atexit.register(_write_peak)
+sys.argv = sys.argv[2:]
+sys.path.insert(0, os.path.dirname(os.path.abspath(sys.argv[0])))
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def run_stage(argv: list) -> dict:
+    """Run one stage in a child process; report wall time and the child's own peak RSS."""
+    # stderr goes to a file so a chatty child cannot block on a full pipe.
+    with tempfile.TemporaryFile() as stderr, tempfile.NamedTemporaryFile(suffix=".rss") as peak:
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", PEAK_RSS_WRAPPER, peak.name] + argv,
+            cwd=REPO_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+        wall = time.perf_counter() - started
+        if proc.returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"{os.path.basename(argv[0])} failed:\n{message}")
+        with open(peak.name) as f:
+            peak_kb = int(f.read())
+    return {"wall_seconds": round(wall, 3), "peak_rss_mb": round(peak_kb / 1024, 1)}
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_history(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_result(history: list, stage: str, rows: int, seed: int):
+    for record in reversed(history):
+        if record["stage"] == stage and record["rows"] == rows and record["seed"] == seed:
+            return record
+    return None
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic datasets")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--workdir", default="data/bench")
+    ap.add_argument("--history", default="benchmarks/history.jsonl")
+    ap.add_argument("--canonical-maps", default="config/canonical_maps.json")
+    ap.add_argument(
+        "--regression-threshold",
+        type=float,
+        default=0.10,
+        help="flag a stage whose rows/sec dropped by more than this share vs the last run",
+    )
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args()
+
+    workdir = os.path.abspath(args.workdir)
+    canonical_maps = os.path.abspath(args.canonical_maps)
+    history = load_history(args.history)
+    revision = git_revision()
+    environment = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "duckdb": duckdb.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+    records = []
+    regressions = []
+
+    for rows in args.sizes:
+        work = os.path.join(workdir, f"{rows}_seed{args.seed}")
+        os.makedirs(work, exist_ok=True)
+        raw = os.path.join(work, "raw.csv")
+        # Generated inputs are cached per size and seed; the generator is deterministic.
+        if not os.path.exists(raw):
+            print(f"generating {rows:,} rows...")
+            # In a child process, so the generator's memory never counts
+            # towards this process or the stages it starts.
+            run_stage([script("generate_dataset.py"), "--out", raw, "--rows", str(rows), "--seed", str(args.seed)])
+
+        for stage in args.stages:
+            argv, outputs = stage_command(stage, raw, work, canonical_maps)
+            result = run_stage(argv)
+            record = {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "revision": revision,
+                "stage": stage,
+                "rows": rows,
+                "seed": args.seed,
+                **result,
+                "rows_per_sec": round(rows / result["wall_seconds"], 1) if result["wall_seconds"] else None,
+                "input_mb": round(os.path.getsize(raw) / 2**20, 2),
+                "output_mb": round(sum(os.path.getsize(p) for p in outputs if os.path.exists(p)) / 2**20, 2),
+                "environment": environment,
+            }
+
+            line = (
+                f"{stage:<9} {rows:>11,} rows  {record['wall_seconds']:>8.2f}s  "
+                f"{record['rows_per_sec']:>12,.0f} rows/s  {record['peak_rss_mb']:>8.1f} MB RSS"
+            )
+            prev = previous_result(history, stage, rows, args.seed)
+            if prev and prev.get("rows_per_sec"):
+                change = record["rows_per_sec"] / prev["rows_per_sec"] - 1
+                line += f"  ({change:+.1%} vs {prev['revision']})"
+                if change < -args.regression_threshold:
+                    regressions.append(f"{stage} @ {rows:,} rows: {change:+.1%} rows/sec vs {prev['revision']}")
+            print(line)
+            records.append(record)
+
+    history_dir = os.path.dirname(args.history)
+    if history_dir:
+        os.makedirs(history_dir, exist_ok=True)
+    with open(args.history, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    print(f"Results appended to: {args.history}")
+
+    if regressions:
+        print("\nRegressions:")
+        for r in regressions:
+            print(f"  - {r}")
+        if args.fail_on_regression:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,308 @@
+import argparse
+import json
+import os
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from analyze_dataset import CATEGORICAL_COLUMNS, norm_text, update_categorical_stats
+from etl_clean import CANONICAL_MAPS
+
+
+# region_code holds short identifiers where a single edit is a different code,
+# so it is left out of typo clustering unless requested explicitly.
+DEFAULT_COLUMNS = [c for c in CATEGORICAL_COLUMNS if c != "region_code"]
+
+# A runner-up spelling within this share of the canonical's frequency means the
+# canonical was picked on a near coin-flip and should be eyeballed.
+REVIEW_FREQUENCY_MARGIN = 0.05
+
+# Below this length a single edit usually makes another valid value
+# ("uk"/"us", "home"/"rome"), so shorter pairs must match exactly.
+MIN_TYPO_LENGTH = 5
+
+
+# --------------------
+# Edit distance / q-gram index
+# --------------------
+def fold_accents(value: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def levenshtein(a: str, b: str, limit: int) -> int:
+    """Edit distance between a and b; returns limit + 1 as soon as it is exceeded."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i]
+        row_min = i
+        for j, cb in enumerate(b, start=1):
+            cost = prev[j - 1] + (ca != cb)
+            cost = min(cost, prev[j] + 1, cur[j - 1] + 1)
+            cur.append(cost)
+            row_min = min(row_min, cost)
+        if row_min > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class QGramIndex:
+    """Inverted index of padded q-grams for bounded edit-distance candidate lookup.
+
+    Each edit destroys at most Q of a string's padded q-grams, so two strings
+    within k edits share at least max(len) + Q - 1 - Q * k of them (counted as
+    multisets). A string sharing T of the query's grams must share one of its
+    len - T + 1 rarest, so only those posting lists are probed; the survivors
+    are then count-filtered, and callers verify them with the bounded
+    levenshtein. Length buckets whose bound is not positive (very short strings
+    with a large edit budget) are returned whole.
+    """
+
+    Q = 3
+
+    def __init__(self):
+        self.postings = defaultdict(list)  # gram -> keys containing it
+        self.key_grams = {}
+        self.by_length = defaultdict(list)
+
+    @classmethod
+    def grams(cls, key: str) -> Counter:
+        padded = "\x00" * (cls.Q - 1) + key + "\x01" * (cls.Q - 1)
+        return Counter(padded[i:i + cls.Q] for i in range(len(padded) - cls.Q + 1))
+
+    def add(self, key: str) -> None:
+        grams = self.grams(key)
+        self.key_grams[key] = grams
+        for gram in grams:
+            self.postings[gram].append(key)
+        self.by_length[len(key)].append(key)
+
+    def min_shared(self, a_len: int, b_len: int, k: int) -> int:
+        return max(a_len, b_len) + self.Q - 1 - self.Q * k
+
+    def candidates(self, key: str, limit_for_length):
+        """Keys that may be within limit_for_length(other_len) edits of `key`."""
+        lengths = {}
+        for length in self.by_length:
+            k = limit_for_length(length)
+            if abs(len(key) - length) <= k:
+                lengths[length] = k
+
+        for length, k in lengths.items():
+            if self.min_shared(len(key), length, k) <= 0:
+                yield from self.by_length[length]
+
+        bounds = [self.min_shared(len(key), n, k) for n, k in lengths.items()]
+        bounds = [b for b in bounds if b > 0]
+        if not bounds:
+            return
+
+        grams = self.grams(key)
+        items = sorted(grams.elements(), key=lambda g: (len(self.postings.get(g, ())), g))
+        probe = set(items[: len(items) - min(bounds) + 1])
+        seen = set()
+        for gram in probe:
+            for other in self.postings.get(gram, ()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                k = lengths.get(len(other))
+                if k is None:
+                    continue
+                bound = self.min_shared(len(key), len(other), k)
+                if bound <= 0:
+                    continue  # already yielded with its length bucket
+                other_grams = self.key_grams[other]
+                if sum(min(n, other_grams[g]) for g, n in grams.items() if g in other_grams) >= bound:
+                    yield other
+
+
+def max_edits(a_len: int, b_len: int, ratio: float) -> int:
+    """Edits allowed between two values: a share of the shorter length, at least 1.
+
+    Pairs where even the longer value is under MIN_TYPO_LENGTH get 0.
+    """
+    if max(a_len, b_len) < MIN_TYPO_LENGTH:
+        return 0
+    return max(1, int(round(min(a_len, b_len) * ratio)))
+
+
+# --------------------
+# Clustering
+# --------------------
+def cluster_values(norm_counts: dict, seeds: set, ratio: float) -> dict:
+    """Group normalized values into typo clusters.
+
+    Values are visited seeds first, then by descending frequency; each unassigned
+    value becomes a canonical and absorbs every unassigned, non-seed value within
+    `max_edits` of it (measured on accent-folded text). Returns {norm: canonical_norm}.
+    """
+    folded_to_norms = defaultdict(list)
+    index = QGramIndex()
+    for norm in norm_counts:
+        folded = fold_accents(norm)
+        if folded not in folded_to_norms:
+            index.add(folded)
+        folded_to_norms[folded].append(norm)
+
+    order = sorted(norm_counts, key=lambda n: (n not in seeds, -norm_counts[n], n))
+    assigned = {}
+    for norm in order:
+        if norm in assigned:
+            continue
+        assigned[norm] = norm
+        folded = fold_accents(norm)
+        for other in index.candidates(folded, lambda other_len: max_edits(len(folded), other_len, ratio)):
+            limit = max_edits(len(folded), len(other), ratio)
+            if levenshtein(folded, other, limit) > limit:
+                continue
+            for candidate in folded_to_norms[other]:
+                if candidate in assigned or candidate in seeds:
+                    continue
+                assigned[candidate] = norm
+    return assigned
+
+
+def build_column_mapping(raw_counts: Counter, norm_to_raws: dict, seeds: dict, ratio: float):
+    """Return (mapping, pending) for one column, both {norm_variant: canonical_raw}.
+
+    Clusters whose canonical was picked by a narrow frequency margin go to
+    `pending` instead of `mapping` so they are not applied until confirmed.
+    `seeds` maps normalized canonical values to their preferred raw spelling.
+    """
+    norm_counts = {
+        norm: sum(raw_counts[raw] for raw in raws)
+        for norm, raws in norm_to_raws.items()
+    }
+    assigned = cluster_values(norm_counts, set(seeds) & set(norm_counts), ratio)
+
+    clusters = defaultdict(list)
+    for norm, canonical in assigned.items():
+        clusters[canonical].append(norm)
+
+    mapping = {}
+    pending = {}
+    for canonical, members in clusters.items():
+        if len(members) == 1 and len(norm_to_raws[canonical]) == 1:
+            continue
+        canonical_raw = seeds.get(canonical) or max(
+            norm_to_raws[canonical], key=lambda raw: (raw_counts[raw], raw)
+        ).strip()
+
+        runner_up = max((norm_counts[n] for n in members if n != canonical), default=0)
+        near_tie = canonical not in seeds and runner_up >= norm_counts[canonical] * (1 - REVIEW_FREQUENCY_MARGIN)
+        target = pending if near_tie else mapping
+        for norm in members:
+            target[norm] = canonical_raw
+
+    return mapping, pending
+
+
+def load_previous(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"version": 0, "columns": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Discover categorical typo clusters and write a canonical mapping file")
+    ap.add_argument("--path", default="data/raw/large_dataset.csv")
+    ap.add_argument("--out", default="config/canonical_maps.json")
+    ap.add_argument("--chunksize", type=int, default=200_000)
+    ap.add_argument("--max-rows", type=int, default=0, help="0 means no limit")
+    ap.add_argument("--columns", nargs="+", default=DEFAULT_COLUMNS)
+    ap.add_argument(
+        "--max-edit-ratio",
+        type=float,
+        default=0.3,
+        help=f"max edits allowed as a share of the shorter value's length (at least 1; 0 when both are under {MIN_TYPO_LENGTH} chars)",
+    )
+    args = ap.parse_args()
+
+    raw_value_counts = {col: Counter() for col in args.columns}
+    norm_to_raws = {col: defaultdict(set) for col in args.columns}
+
+    reader = pd.read_csv(
+        args.path,
+        dtype=str,
+        usecols=lambda c: c in raw_value_counts,
+        chunksize=args.chunksize,
+        encoding="utf-8",
+        encoding_errors="replace",
+        low_memory=False,
+    )
+
+    total_rows = 0
+    for df in reader:
+        if args.max_rows:
+            remaining = args.max_rows - total_rows
+            if remaining <= 0:
+                break
+            if len(df) > remaining:
+                df = df.iloc[:remaining]
+        total_rows += len(df)
+        update_categorical_stats(df, raw_value_counts, norm_to_raws)
+
+    previous = load_previous(args.out)
+    columns = {col: dict(m) for col, m in previous.get("columns", {}).items()}
+    pending = {}
+
+    for col in args.columns:
+        # Canonical spellings already decided (hand-written or in an earlier
+        # version of the file) always win over frequency.
+        seeds = {}
+        for canonical in set(CANONICAL_MAPS.get(col, {}).values()) | set(columns.get(col, {}).values()):
+            seeds[norm_text(canonical)] = canonical
+
+        mapping, col_pending = build_column_mapping(
+            raw_value_counts[col], norm_to_raws[col], seeds, args.max_edit_ratio
+        )
+        merged = columns.get(col, {})
+        merged.update(mapping)
+        if merged:
+            columns[col] = dict(sorted(merged.items()))
+        # Pending clusters are regenerated every run; confirming one means
+        # moving its entries into "columns", after which it acts as a seed.
+        col_pending = {norm: canonical for norm, canonical in col_pending.items() if norm not in merged}
+        if col_pending:
+            pending[col] = dict(sorted(col_pending.items()))
+
+    out = {
+        "version": int(previous.get("version", 0)) + 1,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": args.path,
+        "rows_profiled": total_rows,
+        "columns": columns,
+        "pending": pending,
+    }
+
+    out_dir = os.path.dirname(args.out)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(out, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+    print(f"Profiled {total_rows:,} rows")
+    for col, mapping in columns.items():
+        variants = sum(1 for norm, canonical in mapping.items() if norm != norm_text(canonical))
+        print(f"{col}: {variants:,} variants -> {len(set(mapping.values())):,} canonical values")
+    for col, col_pending in pending.items():
+        canonicals = sorted(set(col_pending.values()))
+        print(f"pending {col}: canonical picked by a narrow frequency margin for {canonicals} (not applied)")
+    print(f"Canonical maps v{out['version']} written to: {args.out}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
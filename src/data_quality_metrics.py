@@ -1,23 +1,10 @@
 import pandas as pd
 import argparse
 import os
+from collections import Counter
 
 
-def main():
-    ap = argparse.ArgumentParser(description="Post-ETL data quality metrics")
-    ap.add_argument("--raw", default="data/raw/large_dataset.csv")
-    ap.add_argument("--clean", default="data/clean/clean_transactions.csv")
-    ap.add_argument("--reject", default="data/reject/rejected_transactions.csv")
-    args = ap.parse_args()
-
-    print("Loading datasets...")
-
-    raw_rows = sum(1 for _ in open(args.raw)) - 1 if os.path.exists(args.raw) else None
-    clean_df = pd.read_csv(args.clean)
-    reject_df = pd.read_csv(args.reject)
-
-    clean_rows = len(clean_df)
-    reject_rows = len(reject_df)
+def print_metrics(raw_rows, clean_rows: int, reject_rows: int, reasons: Counter) -> None:
     total_processed = clean_rows + reject_rows
 
     print("\n=== DATA QUALITY METRICS ===")
@@ -31,20 +18,37 @@ def main():
         reject_rate = (reject_rows / total_processed) * 100
         print(f"Reject rate:     {reject_rate:.2f}%")
 
-    if "reject_reason" in reject_df.columns:
+    if reasons:
         print("\nTop rejection reasons:")
-        reasons = (
-            reject_df["reject_reason"]
-            .str.split(";")
-            .explode()
-            .value_counts()
-            .head(10)
-        )
-        for reason, cnt in reasons.items():
+        for reason, cnt in reasons.most_common(10):
             print(f"  {reason}: {cnt:,}")
 
     print("\nData quality metrics computed successfully.")
 
 
+def count_reject_reasons(reject_reason: pd.Series) -> Counter:
+    return Counter(reject_reason.str.split(";").explode().value_counts().to_dict())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Post-ETL data quality metrics")
+    ap.add_argument("--raw", default="data/raw/large_dataset.csv")
+    ap.add_argument("--clean", default="data/clean/clean_transactions.csv")
+    ap.add_argument("--reject", default="data/reject/rejected_transactions.csv")
+    args = ap.parse_args()
+
+    print("Loading datasets...")
+
+    raw_rows = sum(1 for _ in open(args.raw)) - 1 if os.path.exists(args.raw) else None
+    clean_df = pd.read_csv(args.clean)
+    reject_df = pd.read_csv(args.reject)
+
+    reasons = Counter()
+    if "reject_reason" in reject_df.columns:
+        reasons = count_reject_reasons(reject_df["reject_reason"])
+
+    print_metrics(raw_rows, len(clean_df), len(reject_df), reasons)
+
+
 if __name__ == "__main__":
     main()
@@ -1,8 +1,12 @@
 import argparse
+import hashlib
+import json
 import math
+import os
 import re
 from typing import List
 
+import numpy as np
 import pandas as pd
 
 # --------------------
@@ -90,19 +94,34 @@ def safe_float(v):
         return "__PARSE_FAIL__"
 
 
+def load_canonical_maps(path: str) -> dict:
+    """Merge the built-in CANONICAL_MAPS with a generated mapping file.
+
+    The file is produced by build_canonical_maps.py; its "columns" entries
+    override the built-ins, while unconfirmed "pending" clusters are ignored.
+    Keys are normalized with normalize_text so lookups stay exact.
+    """
+    maps = {col: dict(mapping) for col, mapping in CANONICAL_MAPS.items()}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for col, mapping in data.get("columns", {}).items():
+        maps.setdefault(col, {}).update(
+            {normalize_text(variant): canonical for variant, canonical in mapping.items()}
+        )
+    return maps
+
+
 # --------------------
 # ETL logic
 # --------------------
-def apply_canonical_mapping(df: pd.DataFrame) -> None:
-    for col, mapping in CANONICAL_MAPS.items():
+def apply_canonical_mapping(df: pd.DataFrame, maps: dict = CANONICAL_MAPS) -> None:
+    for col, mapping in maps.items():
         if col not in df.columns:
             continue
-        df[col] = (
-            df[col]
-            .fillna("")
-            .astype(str)
-            .apply(lambda x: mapping.get(normalize_text(x), x.strip()))
-        )
+        s = df[col].fillna("").astype(str)
+        # Resolve each distinct value once; chunks hold a handful of uniques.
+        lookup = {v: mapping.get(normalize_text(v), v.strip()) for v in s.unique()}
+        df[col] = s.map(lookup)
 
 
 def validate_row(row) -> List[str]:
@@ -150,6 +169,238 @@ def validate_row(row) -> List[str]:
     return errors
 
 
+def _column(df: pd.DataFrame, col: str) -> pd.Series:
+    # Absent columns validate like missing values, as row.get() does.
+    if col in df.columns:
+        return df[col]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def _missing_mask(s: pd.Series) -> pd.Series:
+    return s.isna() | s.astype(str).str.strip().eq("")
+
+
+def _parse_floats(s: pd.Series):
+    """Vectorized safe_float: returns (missing, parse_failed, float values) for `s`.
+
+    Each distinct value is parsed once with float(), so accepted spellings
+    ("1e3", "nan", " 5 ") match the row-wise check exactly.
+    """
+    missing = _missing_mask(s)
+    present = s[~missing].astype(str)
+    parsed = {}
+    unparsable = set()
+    for v in present.unique():
+        try:
+            parsed[v] = float(v.strip())
+        except ValueError:
+            unparsable.add(v)
+    failed = present.isin(unparsable).reindex(s.index, fill_value=False)
+    numbers = present.map(parsed).astype(float).reindex(s.index)
+    return missing, failed, numbers
+
+
+def _fails_check(s: pd.Series, is_valid) -> pd.Series:
+    """Mask of present values in `s` for which is_valid(value) is False; one call per distinct value."""
+    present = s[~_missing_mask(s)].astype(str)
+    invalid = {v for v in present.unique() if not is_valid(v)}
+    return present.isin(invalid).reindex(s.index, fill_value=False)
+
+
+def _valid_order_date(v: str) -> bool:
+    try:
+        pd.to_datetime(v, format="%Y-%m-%d")
+        return True
+    except Exception:
+        return False
+
+
+def validate_chunk(df: pd.DataFrame) -> pd.Series:
+    """Column-wise validate_row: the ";"-joined reject reasons for every row of `df`.
+
+    Produces the same codes, in the same order, as applying validate_row per
+    row, without a Python call per row.
+    """
+    checks = []
+
+    # Email. EMAIL_RE only matches ASCII, so it also covers the is_ascii check.
+    checks.append(("INVALID_EMAIL", _fails_check(_column(df, "email"), lambda v: EMAIL_RE.match(v) is not None)))
+
+    # Numeric checks
+    parsed = {
+        col: _parse_floats(_column(df, col))
+        for col in ["quantity", "unit_price", "total_amount", "loyalty_points", "discount_percent", "tax_rate"]
+    }
+    for col in ["quantity", "unit_price", "total_amount", "loyalty_points"]:
+        _, failed, v = parsed[col]
+        checks.append((f"INVALID_{col.upper()}", failed | (v < 0)))
+
+    for col in ["discount_percent", "tax_rate"]:
+        missing, failed, v = parsed[col]
+        checks.append((f"INVALID_{col.upper()}", failed | (~missing & ~failed & ~v.between(0, 100))))
+
+    # Date
+    checks.append(("INVALID_ORDER_DATE", _fails_check(_column(df, "order_date"), _valid_order_date)))
+
+    # Semantic check: total_amount. An unparsable value among otherwise
+    # present inputs is a mismatch, as the row-wise arithmetic would fail.
+    inputs = [parsed[c] for c in ["quantity", "unit_price", "discount_percent", "tax_rate", "total_amount"]]
+    all_present = ~np.logical_or.reduce([missing for missing, _, _ in inputs])
+    any_failed = np.logical_or.reduce([failed for _, failed, _ in inputs])
+    q, up, d, t, tot = (v for _, _, v in inputs)
+    expected = q * up * (1 - d / 100) * (1 + t / 100)
+    checks.append(("TOTAL_AMOUNT_MISMATCH", all_present & (any_failed | ((tot - expected).abs() > 0.05))))
+
+    reasons = pd.Series("", index=df.index, dtype=object)
+    for code, mask in checks:
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any():
+            reasons[mask] = reasons[mask] + ";" + code
+    return reasons.str.lstrip(";")
+
+
+# --------------------
+# Duplicate detection
+# --------------------
+TXN_RE = re.compile(r"^TXN(\d{10})$")
+
+
+class TransactionIdSet:
+    """Streaming set of seen transaction_ids, sized for tens of millions of rows.
+
+    IDs of the form TXN########## are stored as int64 in sorted runs (8 bytes
+    per ID); runs of similar size are merged so lookups touch O(log n) runs.
+    Any other non-empty ID falls back to an exact Python set.
+    """
+
+    def __init__(self):
+        self.runs = []
+        self.other = set()
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs) + len(self.other)
+
+    def _contains(self, nums: np.ndarray) -> np.ndarray:
+        hit = np.zeros(len(nums), dtype=bool)
+        for run in self.runs:
+            if not len(run):
+                continue
+            pos = np.searchsorted(run, nums)
+            pos[pos == len(run)] = 0
+            hit |= run[pos] == nums
+        return hit
+
+    def _add_run(self, run: np.ndarray) -> None:
+        if not len(run):
+            return
+        self.runs.append(run)
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            top = self.runs.pop()
+            merged = np.concatenate([self.runs.pop(), top])
+            merged.sort(kind="stable")
+            self.runs.append(merged)
+
+    def add(self, ids: pd.Series) -> pd.Series:
+        """Record `ids` and return a mask of rows whose ID was already seen.
+
+        The first occurrence of an ID is not flagged, including within `ids`.
+        """
+        s = ids.fillna("").astype(str).str.strip()
+        dup = np.zeros(len(s), dtype=bool)
+
+        extracted = s.str.extract(TXN_RE, expand=False)
+        numeric = extracted.notna().to_numpy()
+        if numeric.any():
+            nums = extracted[numeric].astype("int64").to_numpy()
+            uniq, first_idx, inverse = np.unique(nums, return_index=True, return_inverse=True)
+            seen = self._contains(uniq)
+            in_chunk_dup = np.ones(len(nums), dtype=bool)
+            in_chunk_dup[first_idx] = False
+            dup[numeric] = in_chunk_dup | seen[inverse]
+            self._add_run(uniq[~seen])
+
+        for i in np.flatnonzero(~numeric & (s != "").to_numpy()):
+            v = s.iat[i]
+            if v in self.other:
+                dup[i] = True
+            else:
+                self.other.add(v)
+
+        return pd.Series(dup, index=ids.index)
+
+
+def clean_chunk(df: pd.DataFrame, canonical_maps: dict = CANONICAL_MAPS, seen_ids: TransactionIdSet = None):
+    """Normalize and validate one raw chunk; returns (clean_df, reject_df).
+
+    With `seen_ids`, valid rows repeating the transaction_id of an earlier
+    valid row (in this or a previous chunk) are rejected as
+    DUPLICATE_TRANSACTION_ID. Rows rejected for other reasons never claim an ID.
+    """
+    # Normalize categoricals
+    apply_canonical_mapping(df, canonical_maps)
+
+    # Missing rules
+    if "region_code" in df.columns:
+        df["region_code"] = df["region_code"].fillna("UNKNOWN")
+
+    # Validate rows
+    df["reject_reason"] = validate_chunk(df)
+
+    if seen_ids is not None and "transaction_id" in df.columns:
+        valid = df["reject_reason"] == ""
+        dup = seen_ids.add(df.loc[valid, "transaction_id"])
+        df.loc[dup[dup].index, "reject_reason"] = "DUPLICATE_TRANSACTION_ID"
+
+    clean_df = df[df["reject_reason"] == ""].drop(columns=["reject_reason"])
+    reject_df = df[df["reject_reason"] != ""]
+    return clean_df, reject_df
+
+
+# --------------------
+# Checkpointing
+# --------------------
+FINGERPRINT_SAMPLE_BYTES = 1 << 20
+
+
+def file_fingerprint(path: str) -> dict:
+    """Cheap identity of a large file: size, mtime and a hash of its head and tail."""
+    st = os.stat(path)
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if st.st_size > FINGERPRINT_SAMPLE_BYTES:
+            f.seek(max(FINGERPRINT_SAMPLE_BYTES, st.st_size - FINGERPRINT_SAMPLE_BYTES))
+            h.update(f.read())
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256_head_tail": h.hexdigest()}
+
+
+def load_checkpoint(path: str, run_key: dict):
+    """Return the saved checkpoint if it belongs to the same input/config, else None."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        ckpt = json.load(f)
+    if ckpt.get("run_key") != run_key:
+        return None
+    return ckpt
+
+
+def save_checkpoint(path: str, ckpt: dict) -> None:
+    # Write-then-rename so a crash never leaves a half-written checkpoint.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(ckpt, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def append_csv(df: pd.DataFrame, f) -> None:
+    df.to_csv(f, index=False, header=f.tell() == 0)
+    f.flush()
+    os.fsync(f.fileno())
+
+
 # --------------------
 # Main
 # --------------------
@@ -160,58 +411,102 @@ def main():
     ap.add_argument("--out-reject", default="data/reject/rejected_transactions.csv")
     ap.add_argument("--chunksize", type=int, default=200_000)
     ap.add_argument("--max-rows", type=int, default=0)
+    ap.add_argument("--canonical-maps", default="config/canonical_maps.json")
+    ap.add_argument("--checkpoint", default="", help="defaults to <out-clean>.checkpoint.json")
+    ap.add_argument("--no-resume", action="store_true", help="ignore any checkpoint and start from row 0")
     args = ap.parse_args()
 
-    # Output dirs
-    import os
+    if os.path.exists(args.canonical_maps):
+        canonical_maps = load_canonical_maps(args.canonical_maps)
+        print(f"Using canonical maps from: {args.canonical_maps}")
+    else:
+        canonical_maps = CANONICAL_MAPS
+        print(f"Canonical maps file not found ({args.canonical_maps}); using built-in maps")
 
+    # Output dirs
     for file_path in [args.out_clean, args.out_reject]:
         dir_path = os.path.dirname(file_path)
         if dir_path:
             os.makedirs(dir_path, exist_ok=True)
 
+    checkpoint_path = args.checkpoint or args.out_clean + ".checkpoint.json"
+    # Anything that changes the produced rows must invalidate a checkpoint.
+    run_key = {
+        "input": file_fingerprint(args.input),
+        "canonical_maps": canonical_maps,
+        "out_clean": os.path.abspath(args.out_clean),
+        "out_reject": os.path.abspath(args.out_reject),
+    }
+
+    ckpt = None if args.no_resume else load_checkpoint(checkpoint_path, run_key)
+    if ckpt is None:
+        ckpt = {"run_key": run_key, "rows_read": 0, "clean_bytes": 0, "reject_bytes": 0}
+    else:
+        print(f"Resuming from checkpoint after {ckpt['rows_read']:,} rows")
+
+    # Drop whatever was appended after the last committed chunk.
+    for file_path, size in [(args.out_clean, ckpt["clean_bytes"]), (args.out_reject, ckpt["reject_bytes"])]:
+        with open(file_path, "a+b") as f:
+            f.truncate(size)
+
+    processed = ckpt["rows_read"]
+
+    # The ID set is not checkpointed; only clean rows claim IDs, so rebuild it
+    # from the committed clean output.
+    seen_ids = TransactionIdSet()
+    if processed and ckpt["clean_bytes"]:
+        id_reader = pd.read_csv(
+            args.out_clean,
+            dtype=str,
+            usecols=["transaction_id"],
+            chunksize=args.chunksize,
+            encoding="utf-8",
+        )
+        for ids in id_reader:
+            seen_ids.add(ids["transaction_id"])
+
+    # On resume, skip the header plus every committed row by line count and
+    # re-supply the column names (the raw file has no embedded newlines).
+    columns = pd.read_csv(args.input, nrows=0, encoding="utf-8", encoding_errors="replace").columns
     reader = pd.read_csv(
         args.input,
         dtype=str,
         chunksize=args.chunksize,
+        skiprows=processed + 1,
+        header=None,
+        names=list(columns),
         encoding="utf-8",
         encoding_errors="replace",
         low_memory=False,
     )
 
-    clean_chunks = []
-    reject_chunks = []
-
-    processed = 0
-
-    for df in reader:
-        if args.max_rows and processed >= args.max_rows:
-            break
-
-        processed += len(df)
-
-        # Normalize categoricals
-        apply_canonical_mapping(df)
+    with open(args.out_clean, "a", encoding="utf-8", newline="") as clean_f, \
+            open(args.out_reject, "a", encoding="utf-8", newline="") as reject_f:
+        for df in reader:
+            if args.max_rows:
+                remaining = args.max_rows - processed
+                if remaining <= 0:
+                    break
+                if len(df) > remaining:
+                    df = df.iloc[:remaining].copy()
 
-        # Missing rules
-        if "region_code" in df.columns:
-            df["region_code"] = df["region_code"].fillna("UNKNOWN")
+            processed += len(df)
 
-        # Validate rows
-        error_lists = df.apply(validate_row, axis=1)
-        df["reject_reason"] = error_lists.apply(lambda x: ";".join(x))
+            clean_df, reject_df = clean_chunk(df, canonical_maps, seen_ids)
 
-        clean_df = df[df["reject_reason"] == ""].drop(columns=["reject_reason"])
-        reject_df = df[df["reject_reason"] != ""]
+            append_csv(clean_df, clean_f)
+            append_csv(reject_df, reject_f)
 
-        clean_chunks.append(clean_df)
-        reject_chunks.append(reject_df)
+            ckpt["rows_read"] = processed
+            ckpt["clean_bytes"] = clean_f.tell()
+            ckpt["reject_bytes"] = reject_f.tell()
+            save_checkpoint(checkpoint_path, ckpt)
 
-        print(f"processed {processed:,} rows")
+            print(f"processed {processed:,} rows")
 
-    # Write outputs
-    pd.concat(clean_chunks).to_csv(args.out_clean, index=False)
-    pd.concat(reject_chunks).to_csv(args.out_reject, index=False)
+    # A finished run leaves nothing to resume; the next run starts fresh.
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
 
     print("ETL completed")
     print(f"Clean rows written to: {args.out_clean}")
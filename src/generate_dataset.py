@@ -0,0 +1,254 @@
+import argparse
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+COLUMNS = [
+    "transaction_id",
+    "customer_id",
+    "customer_name",
+    "email",
+    "phone",
+    "country",
+    "city",
+    "postal_code",
+    "department",
+    "category",
+    "product_name",
+    "product_code",
+    "quantity",
+    "unit_price",
+    "discount_percent",
+    "tax_rate",
+    "total_amount",
+    "order_date",
+    "payment_method",
+    "status",
+    "tier",
+    "region_code",
+    "loyalty_points",
+    "rating",
+    "is_returning_customer",
+    "sales_rep_id",
+]
+
+# Canonical value -> typo variants, as observed in DATA_QUALITY.md.
+CATEGORICAL_VALUES = {
+    "country": {
+        "Turkey": ["Turkye", "Türkiye"],
+        "Germany": ["Germeny"],
+        "France": ["Frence"],
+        "UK": [],
+        "Spain": [],
+        "USA": [],
+        "Italy": [],
+    },
+    "city": {
+        "Paris": ["Pariss"],
+        "London": ["Londoon"],
+        "Istanbul": ["Istanbull"],
+        "Berlin": ["Berlinn"],
+        "Rome": [],
+        "New York": [],
+        "Amsterdam": [],
+        "Madrid": [],
+    },
+    "department": {
+        "Support": ["Suport"],
+        "Operations": ["Operatons"],
+        "Marketing": ["Marketng"],
+        "Sales": ["Salles"],
+        "Finance": ["Finnance"],
+        "Legal": ["Leegal"],
+        "HR": [],
+    },
+    "category": {
+        "Electronics": ["Electronnics"],
+        "Hardware": ["Hardwer"],
+        "Software": ["Softwrae"],
+        "Furniture": ["Furnitur"],
+        "Clothing": ["Clothng"],
+    },
+    "payment_method": {
+        "Wire Transfer": ["Wire Tranfer"],
+        "PayPal": ["PayPall"],
+        "Credit Card": ["Credt Card"],
+        "Crypto": ["Cryto"],
+        "Check": ["Chek"],
+    },
+    "status": {
+        "Pending": ["Pendng"],
+        "Processing": ["Procesing"],
+        "Approved": ["Aproved"],
+        "Rejected": ["Rejectd"],
+        "Completed": ["Completted"],
+    },
+    "tier": {
+        "Enterprise": ["Enterprize"],
+        "Professional": ["Profesional"],
+        "Standard": ["Standart"],
+        "Premium": ["Premum"],
+        "Basic": ["Basik"],
+    },
+}
+
+REGION_CODES = ["EU", "APAC", "LATAM", "MEA"]
+
+FIRST_NAMES = ["john", "emma", "pierre", "sophie", "thomas", "elif", "deniz", "maria", "lucas", "anna"]
+LAST_NAMES = ["smith", "martin", "garcia", "rossi", "muller", "dubois", "brown", "silva", "meyer", "kaya"]
+NON_ASCII_NAMES = ["çelik", "öztürk", "şahin", "yılmaz", "koç", "aydın", "ayşe", "müller"]
+EMAIL_DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "company.com", "business.org", "work.net"]
+
+DISCOUNTS = [0, 5, 10, 15, 20]
+TAX_RATES = [0, 8, 10, 18, 20]
+BAD_NUMERIC_VALUES = ["abc", "-1", "12..5"]
+
+# Rows are generated in fixed blocks, each with its own seeded stream, so the
+# output for a given seed does not depend on memory or chunking settings.
+BLOCK_ROWS = 100_000
+
+# Defaults reproduce the rates measured on the original 5M-row file.
+DEFAULT_RATES = {
+    "typo": 0.5,
+    "non_ascii_email": 0.2854,
+    "missing_rating": 0.1663,
+    "missing_region_code": 0.2002,
+    "bad_numeric": 0.0,
+    "total_mismatch": 0.0,
+    "duplicate_id": 0.0,
+}
+
+
+def pick_categorical(rng: np.random.Generator, spec: dict, n: int, typo_rate: float) -> np.ndarray:
+    canonicals = list(spec)
+    idx = rng.integers(0, len(canonicals), n)
+    out = np.array(canonicals, dtype=object)[idx]
+    typo = rng.random(n) < typo_rate
+    for i, canonical in enumerate(canonicals):
+        variants = spec[canonical]
+        mask = typo & (idx == i)
+        if variants and mask.any():
+            out[mask] = np.array(variants, dtype=object)[rng.integers(0, len(variants), int(mask.sum()))]
+    return out
+
+
+def generate_block(block_index: int, n: int, seed: int, rates: dict, start_date: date, days: int) -> pd.DataFrame:
+    rng = np.random.default_rng([seed, block_index])
+    row_ids = np.arange(block_index * BLOCK_ROWS, block_index * BLOCK_ROWS + n) + 1
+
+    df = pd.DataFrame(index=range(n))
+
+    txn_nums = row_ids.copy()
+    dup = rng.random(n) < rates["duplicate_id"]
+    # Point duplicates at an earlier row, possibly in an earlier block.
+    txn_nums[dup] = (rng.random(int(dup.sum())) * row_ids[dup]).astype(np.int64) + 1
+    df["transaction_id"] = pd.Series(txn_nums).map("TXN{:010d}".format)
+
+    df["customer_id"] = pd.Series(rng.integers(0, 100_000, n)).map("CUST{:05d}".format)
+
+    first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), n)]
+    last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), n)]
+    non_ascii = rng.random(n) < rates["non_ascii_email"]
+    last[non_ascii] = np.array(NON_ASCII_NAMES, dtype=object)[rng.integers(0, len(NON_ASCII_NAMES), int(non_ascii.sum()))]
+    first_s = pd.Series(first)
+    last_s = pd.Series(last)
+    df["customer_name"] = first_s.str.capitalize() + " " + last_s.str.capitalize()
+    domains = pd.Series(np.array(EMAIL_DOMAINS, dtype=object)[rng.integers(0, len(EMAIL_DOMAINS), n)])
+    df["email"] = first_s + "." + last_s + pd.Series(rng.integers(0, 1000, n)).astype(str) + "@" + domains
+
+    df["phone"] = pd.Series(rng.integers(0, 10**10, n)).map("+{:010d}".format)
+
+    df["country"] = pick_categorical(rng, CATEGORICAL_VALUES["country"], n, rates["typo"])
+    df["city"] = pick_categorical(rng, CATEGORICAL_VALUES["city"], n, rates["typo"])
+    df["postal_code"] = pd.Series(rng.integers(0, 100_000, n)).map("{:05d}".format)
+    df["department"] = pick_categorical(rng, CATEGORICAL_VALUES["department"], n, rates["typo"])
+    df["category"] = pick_categorical(rng, CATEGORICAL_VALUES["category"], n, rates["typo"])
+
+    product_num = rng.integers(0, 5_000, n)
+    df["product_name"] = pd.Series(product_num).map("Product {}".format)
+    df["product_code"] = pd.Series(product_num).map("PRD{:05d}".format)
+
+    quantity = rng.integers(1, 11, n)
+    unit_price = np.round(rng.uniform(1, 2_000, n), 2)
+    discount = np.array(DISCOUNTS)[rng.integers(0, len(DISCOUNTS), n)]
+    tax = np.array(TAX_RATES)[rng.integers(0, len(TAX_RATES), n)]
+    total = np.round(quantity * unit_price * (1 - discount / 100) * (1 + tax / 100), 2)
+    mismatch = rng.random(n) < rates["total_mismatch"]
+    total[mismatch] = np.round(total[mismatch] + rng.uniform(1, 100, int(mismatch.sum())), 2)
+
+    df["quantity"] = quantity.astype(str)
+    df["unit_price"] = unit_price.astype(str)
+    df["discount_percent"] = discount.astype(str)
+    df["tax_rate"] = tax.astype(str)
+    df["total_amount"] = total.astype(str)
+
+    order_dates = np.datetime64(start_date.isoformat()) + rng.integers(0, days, n).astype("timedelta64[D]")
+    df["order_date"] = order_dates.astype(str)
+
+    df["payment_method"] = pick_categorical(rng, CATEGORICAL_VALUES["payment_method"], n, rates["typo"])
+    df["status"] = pick_categorical(rng, CATEGORICAL_VALUES["status"], n, rates["typo"])
+    df["tier"] = pick_categorical(rng, CATEGORICAL_VALUES["tier"], n, rates["typo"])
+
+    region = np.array(REGION_CODES, dtype=object)[rng.integers(0, len(REGION_CODES), n)]
+    region[rng.random(n) < rates["missing_region_code"]] = ""
+    df["region_code"] = region
+
+    df["loyalty_points"] = rng.integers(0, 1_001, n).astype(str)
+
+    rating = np.round(rng.uniform(1, 5, n), 1).astype(str).astype(object)
+    rating[rng.random(n) < rates["missing_rating"]] = ""
+    df["rating"] = rating
+
+    df["is_returning_customer"] = np.where(rng.random(n) < 0.5, "True", "False")
+    df["sales_rep_id"] = pd.Series(rng.integers(1, 201, n)).map("SR{:03d}".format)
+
+    # Corrupt one random measure per affected row.
+    bad = np.flatnonzero(rng.random(n) < rates["bad_numeric"])
+    if len(bad):
+        measures = ["quantity", "unit_price", "discount_percent", "tax_rate", "loyalty_points", "total_amount"]
+        cols = rng.integers(0, len(measures), len(bad))
+        values = np.array(BAD_NUMERIC_VALUES, dtype=object)[rng.integers(0, len(BAD_NUMERIC_VALUES), len(bad))]
+        for row, col, value in zip(bad, cols, values):
+            df.iat[row, df.columns.get_loc(measures[col])] = value
+
+    return df[COLUMNS]
+
+
+def generate(path: str, rows: int, seed: int = 42, rates: dict = None, start_date: date = date(2021, 1, 1), days: int = 348) -> None:
+    """Write `rows` synthetic transactions to `path`; same arguments give the same bytes."""
+    rates = {**DEFAULT_RATES, **(rates or {})}
+
+    dir_path = os.path.dirname(path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for block_index, start in enumerate(range(0, rows, BLOCK_ROWS)):
+            n = min(BLOCK_ROWS, rows - start)
+            df = generate_block(block_index, n, seed, rates, start_date, days)
+            df.to_csv(f, index=False, header=block_index == 0)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Generate a synthetic large_dataset.csv with injected defects")
+    ap.add_argument("--out", default="data/raw/large_dataset.csv")
+    ap.add_argument("--rows", type=int, default=5_000_000)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--start-date", default="2021-01-01")
+    ap.add_argument("--days", type=int, default=348, help="order_date spans this many days from --start-date")
+    for name, default in DEFAULT_RATES.items():
+        ap.add_argument(f"--{name.replace('_', '-')}-rate", type=float, default=default)
+    args = ap.parse_args()
+
+    rates = {name: getattr(args, f"{name}_rate") for name in DEFAULT_RATES}
+    generate(args.out, args.rows, args.seed, rates, date.fromisoformat(args.start_date), args.days)
+
+    print(f"Generated {args.rows:,} rows (seed={args.seed}) to: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
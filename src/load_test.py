@@ -0,0 +1,280 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from api import SqliteUserStore
+from etl_clean import CANONICAL_MAPS, TransactionIdSet, clean_chunk, load_canonical_maps
+from generate_dataset import generate
+from load_to_warehouse import DIMS_FILE, ShardedWarehouseLoader, WarehouseLoader
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SRC_DIR)
+
+# name -> (path, X-User sending it); users mirror the pre-seeded Postgres ones.
+ENDPOINTS = {
+    "revenue-by-country": ("/metrics/revenue-by-country", "normal_user_a"),
+    "daily-revenue": ("/metrics/daily-revenue", "normal_user_b"),
+    # One month of the generated range; a sharded warehouse reads one shard.
+    "daily-revenue-month": ("/metrics/daily-revenue?start=2021-06-01&end=2021-06-30", "normal_user_b"),
+    "admin-users": ("/admin/users", "admin_user"),
+}
+
+TENANTS = [(1, "tenant_a"), (2, "tenant_b")]
+USERS = [
+    ("admin_user", "admin", None),
+    ("normal_user_a", "user", 1),
+    ("normal_user_b", "user", 2),
+    ("guest_user", "guest", None),
+]
+
+
+# --------------------
+# Fixtures
+# --------------------
+def build_warehouse(raw: str, db: str, canonical_maps: dict, chunksize: int = 200_000, shard_dir: str = "") -> int:
+    """Load `raw` through the ETL into `db`, or into monthly shards under `shard_dir`."""
+    if shard_dir:
+        loader = ShardedWarehouseLoader(shard_dir, "fact_transactions")
+        con = loader.con
+    else:
+        con = duckdb.connect(db)
+        loader = WarehouseLoader(con, "fact_transactions")
+    seen_ids = TransactionIdSet()
+    for df in pd.read_csv(raw, dtype=str, chunksize=chunksize):
+        clean_df, _ = clean_chunk(df, canonical_maps, seen_ids)
+        loader.append(clean_df)
+    loader.commit()
+    con.close()
+    return loader.rows
+
+
+def seed_user_store(path: str) -> None:
+    SqliteUserStore(path).create_schema()
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT OR REPLACE INTO tenants VALUES (?, ?)", TENANTS)
+    conn.executemany("INSERT OR REPLACE INTO users VALUES (?, ?, ?)", USERS)
+    conn.commit()
+    conn.close()
+
+
+def start_api(host: str, port: int, workers: int, duckdb_path: str, user_db: str, shard_dir: str = ""):
+    env = dict(os.environ, DUCKDB_PATH=duckdb_path, WAREHOUSE_SHARD_DIR=shard_dir, USER_STORE=f"sqlite:{user_db}")
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.api:app",
+            "--host", host, "--port", str(port), "--workers", str(workers),
+            "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=REPO_DIR,
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("API process exited during startup")
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("API did not start listening within 30s")
+
+
+# --------------------
+# Load generation
+# --------------------
+def parse_mix(spec: str) -> dict:
+    """'revenue-by-country=4,daily-revenue=4,admin-users=1' -> {name: weight}."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; expected one of {sorted(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def client_loop(host, port, mix, seed, warmup_until, stop_at, results, lock):
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    local = []
+
+    while time.perf_counter() < stop_at:
+        name = rng.choices(names, weights)[0]
+        path, user = ENDPOINTS[name]
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path, headers={"X-User": user})
+            resp = conn.getresponse()
+            resp.read()
+            status = resp.status
+        except (OSError, http.client.HTTPException):
+            status = None
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        elapsed = time.perf_counter() - started
+        if started >= warmup_until:
+            local.append((name, elapsed, status))
+
+    conn.close()
+    with lock:
+        results.extend(local)
+
+
+def summarize(results: list, duration: float) -> dict:
+    by_endpoint = defaultdict(list)
+    errors = defaultdict(int)
+    for name, elapsed, status in results:
+        by_endpoint[name].append(elapsed)
+        by_endpoint["ALL"].append(elapsed)
+        if status is None or status >= 400:
+            errors[name] += 1
+            errors["ALL"] += 1
+
+    summary = {}
+    for name, latencies in by_endpoint.items():
+        ms = np.array(latencies) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        summary[name] = {
+            "requests": len(ms),
+            "errors": errors[name],
+            "throughput_rps": round(len(ms) / duration, 1),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(ms.max()), 2),
+        }
+    return summary
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Load-test the analytics API with a local warehouse and user store")
+    ap.add_argument("--url", default="", help="test an already running API (host:port) instead of starting one")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--server-workers", type=int, default=1)
+    ap.add_argument("--rows", type=int, default=200_000, help="rows in the generated warehouse")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--workdir", default="data/loadtest")
+    ap.add_argument("--canonical-maps", default="config/canonical_maps.json")
+    ap.add_argument("--rebuild", action="store_true", help="rebuild the cached warehouse for this size/seed")
+    ap.add_argument(
+        "--warehouse",
+        choices=["single", "sharded"],
+        default="single",
+        help="serve one warehouse.duckdb or monthly shards via WAREHOUSE_SHARD_DIR",
+    )
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds of measured load")
+    ap.add_argument("--warmup", type=float, default=3.0, help="seconds of unmeasured load first")
+    ap.add_argument("--mix", default="revenue-by-country=4,daily-revenue=4,admin-users=1")
+    ap.add_argument("--history", default="benchmarks/api_history.jsonl")
+    args = ap.parse_args()
+
+    mix = parse_mix(args.mix)
+    proc = None
+
+    if args.url:
+        host, _, port = args.url.partition(":")
+        port = int(port or 80)
+    else:
+        host, port = "127.0.0.1", args.port
+        work = os.path.abspath(os.path.join(args.workdir, f"{args.rows}_seed{args.seed}"))
+        os.makedirs(work, exist_ok=True)
+        raw = os.path.join(work, "raw.csv")
+        db = os.path.join(work, "warehouse.duckdb")
+        user_db = os.path.join(work, "users.sqlite")
+        shard_dir = os.path.join(work, "shards") if args.warehouse == "sharded" else ""
+        built = os.path.exists(os.path.join(shard_dir, DIMS_FILE)) if shard_dir else os.path.exists(db)
+
+        if args.rebuild or not built:
+            if not os.path.exists(raw):
+                print(f"generating {args.rows:,} rows...")
+                generate(raw, args.rows, args.seed)
+            if os.path.exists(args.canonical_maps):
+                canonical_maps = load_canonical_maps(args.canonical_maps)
+            else:
+                canonical_maps = CANONICAL_MAPS
+            loaded = build_warehouse(raw, db, canonical_maps, shard_dir=shard_dir)
+            print(f"warehouse built: {loaded:,} clean rows")
+        seed_user_store(user_db)
+        proc = start_api(host, port, args.server_workers, db, user_db, shard_dir)
+
+    try:
+        results = []
+        lock = threading.Lock()
+        warmup_until = time.perf_counter() + args.warmup
+        stop_at = warmup_until + args.duration
+        threads = [
+            threading.Thread(
+                target=client_loop,
+                args=(host, port, mix, args.seed + i, warmup_until, stop_at, results, lock),
+            )
+            for i in range(args.concurrency)
+        ]
+        print(f"running {args.concurrency} clients for {args.warmup:g}s warmup + {args.duration:g}s...")
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    if not results:
+        print("No requests completed during the measured window")
+        return 1
+
+    summary = summarize(results, args.duration)
+
+    print(f"\n{'endpoint':<20} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name in list(mix) + ["ALL"]:
+        if name not in summary:
+            continue
+        r = summary[name]
+        print(
+            f"{name:<20} {r['requests']:>9,} {r['errors']:>7,} {r['throughput_rps']:>8.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}"
+        )
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.url or "local",
+        "rows": None if args.url else args.rows,
+        "warehouse": None if args.url else args.warehouse,
+        "concurrency": args.concurrency,
+        "server_workers": None if args.url else args.server_workers,
+        "duration_seconds": args.duration,
+        "mix": mix,
+        "endpoints": summary,
+    }
+    history_dir = os.path.dirname(args.history)
+    if history_dir:
+        os.makedirs(history_dir, exist_ok=True)
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\nResults appended to: {args.history}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
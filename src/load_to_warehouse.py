@@ -4,34 +4,362 @@ import argparse
 import os
 
 
+# Measures are stored as DOUBLE regardless of how a given chunk happens to
+# parse, so every chunk appends into the same column types.
+NUMERIC_COLUMNS = [
+    "quantity",
+    "unit_price",
+    "discount_percent",
+    "tax_rate",
+    "loyalty_points",
+    "rating",
+    "total_amount",
+]
+
+BOOLEAN_COLUMNS = ["is_returning_customer"]
+
+
+def coerce_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Turn a clean chunk read as strings into warehouse column types."""
+    df = df.copy()
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    for col in BOOLEAN_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map({"True": True, "False": False}).astype("boolean")
+    return df
+
+
+LAYOUTS = ["star", "flat"]
+
+# Fact rows are stored in this order so DuckDB's per-row-group min/max (zone
+# maps) can skip row groups for date-range and country filters.
+FACT_SORT_KEY = "date_key, country"
+
+DIM_DATE_SQL = """
+SELECT
+    CAST(strftime(d, '%Y%m%d') AS INTEGER) AS date_key,
+    d AS date,
+    CAST(day(d) AS TINYINT) AS day,
+    CAST(month(d) AS TINYINT) AS month,
+    CAST(quarter(d) AS TINYINT) AS quarter,
+    CAST(year(d) AS SMALLINT) AS year,
+    CAST(isodow(d) AS TINYINT) AS day_of_week
+FROM (SELECT DISTINCT CAST(order_date AS DATE) AS d FROM {staging} s WHERE s.order_date IS NOT NULL AND {where})
+ORDER BY date_key
+"""
+
+DIM_CUSTOMER_SQL = """
+SELECT
+    customer_id,
+    arg_min(customer_name, transaction_id) AS customer_name,
+    arg_min(email, transaction_id) AS email,
+    arg_min(tier, transaction_id) AS tier,
+    arg_min(region_code, transaction_id) AS region_code
+FROM {staging}
+WHERE customer_id IS NOT NULL
+GROUP BY customer_id
+"""
+
+DIM_PRODUCT_SQL = """
+SELECT
+    product_code,
+    arg_min(product_name, transaction_id) AS product_name,
+    arg_min(category, transaction_id) AS category,
+    arg_min(department, transaction_id) AS department
+FROM {staging}
+WHERE product_code IS NOT NULL
+GROUP BY product_code
+"""
+
+DIM_GEOGRAPHY_SQL = """
+SELECT DISTINCT country, city, region_code FROM {staging}
+"""
+
+STAR_DIMENSIONS_SQL = f"""
+CREATE TABLE dim_date__new AS {DIM_DATE_SQL.replace("{where}", "TRUE")};
+
+CREATE TABLE dim_customer__new AS
+SELECT CAST(row_number() OVER (ORDER BY customer_id) AS INTEGER) AS customer_key, *
+FROM ({DIM_CUSTOMER_SQL})
+ORDER BY customer_key;
+
+CREATE TABLE dim_product__new AS
+SELECT CAST(row_number() OVER (ORDER BY product_code) AS INTEGER) AS product_key, *
+FROM ({DIM_PRODUCT_SQL})
+ORDER BY product_key;
+
+CREATE TABLE dim_geography__new AS
+SELECT CAST(row_number() OVER (ORDER BY country, city, region_code) AS INTEGER) AS geography_key, *
+FROM ({DIM_GEOGRAPHY_SQL})
+ORDER BY geography_key;
+"""
+
+FACT_SQL = """
+SELECT
+    s.transaction_id,
+    c.customer_key,
+    p.product_key,
+    CAST(strftime(CAST(s.order_date AS DATE), '%Y%m%d') AS INTEGER) AS date_key,
+    g.geography_key,
+    s.country,
+    s.city,
+    s.department,
+    s.category,
+    s.payment_method,
+    s.status,
+    s.tier,
+    s.region_code,
+    s.quantity,
+    s.unit_price,
+    s.discount_percent,
+    s.tax_rate,
+    s.total_amount,
+    s.loyalty_points,
+    s.rating,
+    s.is_returning_customer,
+    s.sales_rep_id
+FROM {staging} s
+LEFT JOIN {dim_customer} c ON s.customer_id = c.customer_id
+LEFT JOIN {dim_product} p ON s.product_code = p.product_code
+LEFT JOIN {dim_geography} g
+    ON s.country IS NOT DISTINCT FROM g.country
+    AND s.city IS NOT DISTINCT FROM g.city
+    AND s.region_code IS NOT DISTINCT FROM g.region_code
+WHERE {where}
+ORDER BY {sort_key}
+"""
+
+DIMENSION_TABLES = ["dim_date", "dim_customer", "dim_product", "dim_geography"]
+
+
+class WarehouseLoader:
+    """Append clean chunks into a staging table and publish them on commit.
+
+    With layout="star" (default) commit() builds the dimension tables and a
+    fact table sorted by FACT_SORT_KEY; "flat" keeps the staging rows as-is.
+    Readers keep seeing the previous load until commit() swaps tables in.
+    """
+
+    def __init__(self, con, table: str, layout: str = "star"):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout: {layout!r}")
+        self.con = con
+        self.table = table
+        self.layout = layout
+        self.staging = f"{table}__staging"
+        self.rows = 0
+        self._created = False
+        con.execute(f"DROP TABLE IF EXISTS {self.staging}")
+
+    def append(self, df: pd.DataFrame) -> None:
+        chunk = coerce_types(df)
+        if not self._created:
+            # The star build only reads staging, so keep it out of the database
+            # file (dropped tables leave their blocks behind in it).
+            temp = "TEMP " if self.layout == "star" else ""
+            self.con.execute(f"CREATE {temp}TABLE {self.staging} AS SELECT * FROM chunk")
+            self._created = True
+        else:
+            self.con.execute(f"INSERT INTO {self.staging} SELECT * FROM chunk")
+        self.rows += len(chunk)
+
+    def commit(self) -> None:
+        if not self._created:
+            raise ValueError("No rows were appended; refusing to replace the fact table")
+        if self.layout == "flat":
+            self.con.execute("BEGIN TRANSACTION")
+            self.con.execute(f"DROP TABLE IF EXISTS {self.table}")
+            self.con.execute(f"ALTER TABLE {self.staging} RENAME TO {self.table}")
+            self.con.execute("COMMIT")
+            return
+
+        tables = DIMENSION_TABLES + [self.table]
+        for name in tables:
+            self.con.execute(f"DROP TABLE IF EXISTS {name}__new")
+        self.con.execute(STAR_DIMENSIONS_SQL.format(staging=self.staging))
+        fact_sql = FACT_SQL.format(
+            staging=self.staging,
+            dim_customer="dim_customer__new",
+            dim_product="dim_product__new",
+            dim_geography="dim_geography__new",
+            where="TRUE",
+            sort_key=FACT_SORT_KEY,
+        )
+        self.con.execute(f"CREATE TABLE {self.table}__new AS {fact_sql}")
+
+        self.con.execute("BEGIN TRANSACTION")
+        for name in tables:
+            self.con.execute(f"DROP TABLE IF EXISTS {name}")
+            self.con.execute(f"ALTER TABLE {name}__new RENAME TO {name}")
+        self.con.execute(f"DROP TABLE {self.staging}")
+        self.con.execute("COMMIT")
+
+
+# Shared dimensions for a sharded warehouse. Keys are only ever appended, so
+# a shard written earlier keeps pointing at the right rows.
+SHARD_DIMENSIONS_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS dims.dim_customer (
+    customer_key INTEGER, customer_id VARCHAR, customer_name VARCHAR,
+    email VARCHAR, tier VARCHAR, region_code VARCHAR
+);
+CREATE TABLE IF NOT EXISTS dims.dim_product (
+    product_key INTEGER, product_code VARCHAR, product_name VARCHAR,
+    category VARCHAR, department VARCHAR
+);
+CREATE TABLE IF NOT EXISTS dims.dim_geography (
+    geography_key INTEGER, country VARCHAR, city VARCHAR, region_code VARCHAR
+);
+"""
+
+SHARD_DIMENSIONS_APPEND_SQL = f"""
+INSERT INTO dims.dim_customer
+SELECT
+    CAST((SELECT COALESCE(MAX(customer_key), 0) FROM dims.dim_customer)
+         + row_number() OVER (ORDER BY customer_id) AS INTEGER),
+    *
+FROM ({DIM_CUSTOMER_SQL}) n
+WHERE NOT EXISTS (SELECT 1 FROM dims.dim_customer d WHERE d.customer_id = n.customer_id);
+
+INSERT INTO dims.dim_product
+SELECT
+    CAST((SELECT COALESCE(MAX(product_key), 0) FROM dims.dim_product)
+         + row_number() OVER (ORDER BY product_code) AS INTEGER),
+    *
+FROM ({DIM_PRODUCT_SQL}) n
+WHERE NOT EXISTS (SELECT 1 FROM dims.dim_product d WHERE d.product_code = n.product_code);
+
+INSERT INTO dims.dim_geography
+SELECT
+    CAST((SELECT COALESCE(MAX(geography_key), 0) FROM dims.dim_geography)
+         + row_number() OVER (ORDER BY country, city, region_code) AS INTEGER),
+    *
+FROM ({DIM_GEOGRAPHY_SQL}) n
+WHERE NOT EXISTS (
+    SELECT 1 FROM dims.dim_geography d
+    WHERE d.country IS NOT DISTINCT FROM n.country
+    AND d.city IS NOT DISTINCT FROM n.city
+    AND d.region_code IS NOT DISTINCT FROM n.region_code
+);
+"""
+
+DIMS_FILE = "dims.duckdb"
+UNDATED_SHARD = "undated"
+
+
+def shard_path(shard_dir: str, month: str) -> str:
+    """fact_<YYYY_MM>.duckdb, or fact_undated.duckdb for rows without order_date."""
+    return os.path.join(shard_dir, f"fact_{month}.duckdb")
+
+
+def quote_path(path: str) -> str:
+    return "'" + path.replace("'", "''") + "'"
+
+
+class ShardedWarehouseLoader(WarehouseLoader):
+    """Star-schema load split into one DuckDB file per order month.
+
+    commit() appends new keys to the shared dims file, then rewrites only the
+    month shards present in the staged rows (or just `months`, "YYYY-MM").
+    Each shard holds that month's sorted fact_transactions and dim_date and
+    is written to a temp file and renamed into place.
+    """
+
+    def __init__(self, shard_dir: str, table: str = "fact_transactions", months=None):
+        super().__init__(duckdb.connect(), table, "star")
+        self.shard_dir = shard_dir
+        self.months = {m.replace("-", "_") for m in months} if months else None
+        self.shards_written = []
+
+    def commit(self) -> None:
+        if not self._created:
+            raise ValueError("No rows were appended; refusing to replace any shard")
+        os.makedirs(self.shard_dir, exist_ok=True)
+        con = self.con
+
+        con.execute(f"ATTACH {quote_path(os.path.join(self.shard_dir, DIMS_FILE))} AS dims")
+        con.execute(SHARD_DIMENSIONS_SCHEMA_SQL)
+        con.execute("BEGIN TRANSACTION")
+        con.execute(SHARD_DIMENSIONS_APPEND_SQL.format(staging=self.staging))
+        con.execute("COMMIT")
+
+        month_expr = "strftime(CAST(s.order_date AS DATE), '%Y_%m')"
+        months = [
+            row[0] or UNDATED_SHARD
+            for row in con.execute(f"SELECT DISTINCT {month_expr} FROM {self.staging} s ORDER BY 1").fetchall()
+        ]
+        if self.months is not None:
+            months = [m for m in months if m in self.months]
+
+        for month in months:
+            where = "s.order_date IS NULL" if month == UNDATED_SHARD else f"{month_expr} = '{month}'"
+            final_path = shard_path(self.shard_dir, month)
+            tmp_path = final_path + ".tmp"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            con.execute(f"ATTACH {quote_path(tmp_path)} AS shard")
+            con.execute(
+                f"CREATE TABLE shard.dim_date AS {DIM_DATE_SQL.format(staging=self.staging, where=where)}"
+            )
+            fact_sql = FACT_SQL.format(
+                staging=self.staging,
+                dim_customer="dims.dim_customer",
+                dim_product="dims.dim_product",
+                dim_geography="dims.dim_geography",
+                where=where,
+                sort_key=FACT_SORT_KEY,
+            )
+            con.execute(f"CREATE TABLE shard.{self.table} AS {fact_sql}")
+            con.execute("DETACH shard")
+            os.replace(tmp_path, final_path)
+            self.shards_written.append(final_path)
+
+        con.execute("DETACH dims")
+        con.execute(f"DROP TABLE {self.staging}")
+
+
 def main():
     ap = argparse.ArgumentParser(description="Load clean data into DuckDB warehouse")
     ap.add_argument("--input", default="data/clean/clean_transactions.csv")
     ap.add_argument("--db", default="warehouse.duckdb")
     ap.add_argument("--table", default="fact_transactions")
+    ap.add_argument("--chunksize", type=int, default=200_000)
+    ap.add_argument("--layout", choices=LAYOUTS, default="star")
+    ap.add_argument("--shard-dir", default="", help="write per-month shard files here instead of --db")
+    ap.add_argument("--months", nargs="+", help="with --shard-dir, only rewrite these months (YYYY-MM)")
     args = ap.parse_args()
 
     if not os.path.exists(args.input):
         raise FileNotFoundError(f"Clean dataset not found: {args.input}")
 
-    print("Connecting to DuckDB warehouse...")
-    con = duckdb.connect(args.db)
+    if args.shard_dir:
+        print(f"Writing monthly shards to: {args.shard_dir}")
+        loader = ShardedWarehouseLoader(args.shard_dir, args.table, args.months)
+        con = loader.con
+    else:
+        print("Connecting to DuckDB warehouse...")
+        con = duckdb.connect(args.db)
+        loader = WarehouseLoader(con, args.table, args.layout)
 
     print("Loading clean dataset...")
-    df = pd.read_csv(args.input)
+    reader = pd.read_csv(args.input, dtype=str, chunksize=args.chunksize)
 
     print("Creating fact table...")
-    con.execute(f"DROP TABLE IF EXISTS {args.table}")
-    con.execute(f"""
-        CREATE TABLE {args.table} AS
-        SELECT *
-        FROM df
-    """)
+    for df in reader:
+        loader.append(df)
+    loader.commit()
 
     print("Warehouse load completed")
-    print(f"Database: {args.db}")
-    print(f"Table: {args.table}")
-    print(f"Rows loaded: {len(df):,}")
+    if args.shard_dir:
+        print(f"Shards written: {len(loader.shards_written)}")
+        for path in loader.shards_written:
+            print(f"  - {path}")
+    else:
+        print(f"Database: {args.db}")
+    print(f"Table: {args.table} ({args.layout} layout)")
+    print(f"Rows loaded: {loader.rows:,}")
 
     con.close()
 
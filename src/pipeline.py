@@ -0,0 +1,163 @@
+import argparse
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+import pandas as pd
+
+from analyze_dataset import DataQualityProfile
+from data_quality_metrics import count_reject_reasons, print_metrics
+from etl_clean import CANONICAL_MAPS, TransactionIdSet, append_csv, clean_chunk, load_canonical_maps
+from load_to_warehouse import ShardedWarehouseLoader, WarehouseLoader
+
+
+_DONE = object()
+
+
+def prefetch(iterable, depth: int):
+    """Iterate `iterable` on a background thread, keeping up to `depth` items ready.
+
+    pandas releases the GIL while tokenizing, so parsing the next chunk overlaps
+    with work on the current one. Errors in the producer are re-raised here.
+    """
+    q = queue.Queue(maxsize=depth)
+
+    def produce():
+        try:
+            for item in iterable:
+                q.put(item)
+            q.put(_DONE)
+        except BaseException as e:
+            q.put(e)
+
+    # Daemon so an early break (e.g. --max-rows) does not hang on a full queue.
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = q.get()
+        if item is _DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Single-pass profile -> clean -> load pipeline")
+    ap.add_argument("--input", default="data/raw/large_dataset.csv")
+    ap.add_argument("--out-clean", default="data/clean/clean_transactions.csv")
+    ap.add_argument("--out-reject", default="data/reject/rejected_transactions.csv")
+    ap.add_argument("--db", default="warehouse.duckdb")
+    ap.add_argument("--table", default="fact_transactions")
+    ap.add_argument("--shard-dir", default="", help="write per-month shard files here instead of --db")
+    ap.add_argument("--chunksize", type=int, default=200_000)
+    ap.add_argument("--max-rows", type=int, default=0, help="0 means no limit")
+    ap.add_argument("--canonical-maps", default="config/canonical_maps.json")
+    ap.add_argument("--top-k", type=int, default=25)
+    ap.add_argument("--prefetch", type=int, default=2, help="chunks parsed ahead on a reader thread")
+    ap.add_argument("--no-overlap", action="store_true", help="parse, clean and write on one thread")
+    args = ap.parse_args()
+
+    started = time.perf_counter()
+
+    if os.path.exists(args.canonical_maps):
+        canonical_maps = load_canonical_maps(args.canonical_maps)
+    else:
+        canonical_maps = CANONICAL_MAPS
+
+    for file_path in [args.out_clean, args.out_reject]:
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    # One parse of the raw file; every consumer below works on the same chunk.
+    reader = pd.read_csv(
+        args.input,
+        dtype=str,
+        chunksize=args.chunksize,
+        encoding="utf-8",
+        encoding_errors="replace",
+        low_memory=False,
+    )
+    if not args.no_overlap:
+        reader = prefetch(reader, max(1, args.prefetch))
+
+    profile = DataQualityProfile()
+    seen_ids = TransactionIdSet()
+    reasons = Counter()
+    clean_rows = 0
+    reject_rows = 0
+
+    if args.shard_dir:
+        loader = ShardedWarehouseLoader(args.shard_dir, args.table)
+        con = loader.con
+    else:
+        con = duckdb.connect(args.db)
+        loader = WarehouseLoader(con, args.table)
+
+    def write(clean_df, reject_df, clean_f, reject_f):
+        append_csv(clean_df, clean_f)
+        append_csv(reject_df, reject_f)
+        loader.append(clean_df)
+
+    # A single writer thread keeps chunks in order; at most one write is in
+    # flight so memory stays bounded to a couple of chunks.
+    executor = None if args.no_overlap else ThreadPoolExecutor(max_workers=1)
+    pending = None
+
+    with open(args.out_clean, "w", encoding="utf-8", newline="") as clean_f, \
+            open(args.out_reject, "w", encoding="utf-8", newline="") as reject_f:
+        for chunk_index, df in enumerate(reader, start=1):
+            if args.max_rows:
+                remaining = args.max_rows - profile.total_rows
+                if remaining <= 0:
+                    break
+                if len(df) > remaining:
+                    df = df.iloc[:remaining].copy()
+
+            # Profile before cleaning: clean_chunk normalizes df in place.
+            profile.update(df)
+            clean_df, reject_df = clean_chunk(df, canonical_maps, seen_ids)
+
+            clean_rows += len(clean_df)
+            reject_rows += len(reject_df)
+            reasons.update(count_reject_reasons(reject_df["reject_reason"]))
+
+            if executor is None:
+                write(clean_df, reject_df, clean_f, reject_f)
+            else:
+                if pending is not None:
+                    pending.result()
+                pending = executor.submit(write, clean_df, reject_df, clean_f, reject_f)
+
+            if chunk_index % 5 == 0:
+                print(f"processed {profile.total_rows:,} rows...")
+
+        if pending is not None:
+            pending.result()
+        if executor is not None:
+            executor.shutdown()
+
+    loader.commit()
+    con.close()
+
+    profile.print_report(args.top_k)
+    print_metrics(profile.total_rows, clean_rows, reject_rows, reasons)
+
+    print("\nPipeline completed")
+    print(f"Clean rows written to: {args.out_clean}")
+    print(f"Rejected rows written to: {args.out_reject}")
+    if args.shard_dir:
+        print(f"Warehouse: {len(loader.shards_written)} shards in {args.shard_dir} ({args.table}, {loader.rows:,} rows)")
+    else:
+        print(f"Warehouse: {args.db} ({args.table}, {loader.rows:,} rows)")
+    print(f"Wall time: {time.perf_counter() - started:.1f}s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
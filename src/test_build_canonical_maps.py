@@ -0,0 +1,65 @@
+import random
+import string
+import time
+
+from build_canonical_maps import cluster_values, fold_accents, levenshtein, max_edits
+
+
+def synthetic_counts(n_words: int, seed: int = 7) -> dict:
+    """`n_words` random words of 5-14 letters, each with a few one- or two-edit typos."""
+    rng = random.Random(seed)
+    counts = {}
+    for _ in range(n_words):
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 14)))
+        counts[word] = rng.randint(50, 100)
+        for _ in range(rng.randint(0, 3)):
+            typo = list(word)
+            for _ in range(rng.randint(1, 2)):
+                i = rng.randrange(len(typo))
+                op = rng.choice(["sub", "del", "ins"])
+                if op == "sub":
+                    typo[i] = rng.choice(string.ascii_lowercase)
+                elif op == "del" and len(typo) > 5:
+                    del typo[i]
+                else:
+                    typo.insert(i, rng.choice(string.ascii_lowercase))
+            counts.setdefault("".join(typo), rng.randint(1, 20))
+    return counts
+
+
+def brute_force_clusters(norm_counts: dict, seeds: set, ratio: float) -> dict:
+    order = sorted(norm_counts, key=lambda n: (n not in seeds, -norm_counts[n], n))
+    assigned = {}
+    for norm in order:
+        if norm in assigned:
+            continue
+        assigned[norm] = norm
+        folded = fold_accents(norm)
+        for other in norm_counts:
+            if other in assigned or other in seeds:
+                continue
+            other_folded = fold_accents(other)
+            limit = max_edits(len(folded), len(other_folded), ratio)
+            if levenshtein(folded, other_folded, limit) <= limit:
+                assigned[other] = norm
+    return assigned
+
+
+def test_matches_brute_force():
+    counts = synthetic_counts(150)
+    counts.update({"türkiye": 5, "turkiye": 3, "turkye": 2, "uk": 10, "us": 9})
+    seeds = {"turkiye"}
+    for ratio in [0.3, 0.6]:
+        assert cluster_values(counts, seeds, ratio) == brute_force_clusters(counts, seeds, ratio)
+
+
+def test_thousands_of_values_cluster_quickly():
+    counts = synthetic_counts(2_000)
+    assert len(counts) > 4_000
+
+    started = time.perf_counter()
+    assigned = cluster_values(counts, set(), 0.3)
+    elapsed = time.perf_counter() - started
+
+    assert len(assigned) == len(counts)
+    assert elapsed < 10, f"clustering {len(counts):,} values took {elapsed:.1f}s"
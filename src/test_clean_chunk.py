@@ -0,0 +1,23 @@
+import pandas as pd
+
+from etl_clean import TransactionIdSet, clean_chunk
+
+
+def chunk(txn_id, email):
+    return pd.DataFrame({"transaction_id": [txn_id], "email": [email], "quantity": ["1"]})
+
+
+def test_rejected_row_does_not_claim_its_id():
+    seen = TransactionIdSet()
+    clean, reject = clean_chunk(chunk("TXN0000000001", "not-an-email"), seen_ids=seen)
+    assert clean.empty and reject["reject_reason"].tolist() == ["INVALID_EMAIL"]
+
+    clean, reject = clean_chunk(chunk("TXN0000000001", "a@b.co"), seen_ids=seen)
+    assert clean["transaction_id"].tolist() == ["TXN0000000001"] and reject.empty
+
+
+def test_later_valid_repeat_is_duplicate():
+    seen = TransactionIdSet()
+    clean_chunk(chunk("TXN0000000001", "a@b.co"), seen_ids=seen)
+    clean, reject = clean_chunk(chunk("TXN0000000001", "c@d.co"), seen_ids=seen)
+    assert clean.empty and reject["reject_reason"].tolist() == ["DUPLICATE_TRANSACTION_ID"]
@@ -21,10 +21,14 @@ print(df)
 
 # Daily revenue trend
 df = con.execute("""
-    SELECT order_date, SUM(total_amount) AS revenue
-    FROM fact_transactions
-    GROUP BY order_date
-    ORDER BY order_date
+    SELECT d.date AS order_date, f.revenue
+    FROM (
+        SELECT date_key, SUM(total_amount) AS revenue
+        FROM fact_transactions
+        GROUP BY date_key
+    ) f
+    JOIN dim_date d USING (date_key)
+    ORDER BY d.date
     LIMIT 10
 """).fetchdf()
 
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from etl_clean import TransactionIdSet
+
+
+def txn(*nums):
+    return pd.Series([f"TXN{n:010d}" for n in nums])
+
+
+def test_flags_repeats_within_and_across_chunks():
+    seen = TransactionIdSet()
+    assert seen.add(txn(1, 2, 2)).tolist() == [False, False, True]
+    assert seen.add(txn(3, 1)).tolist() == [False, True]
+    assert len(seen) == 3
+
+
+def test_all_duplicate_chunk_then_new_chunk():
+    seen = TransactionIdSet()
+    assert seen.add(txn(1, 2)).tolist() == [False, False]
+    assert seen.add(txn(1, 2)).tolist() == [True, True]
+    assert seen.add(txn(3, 1)).tolist() == [False, True]
+    assert all(len(run) for run in seen.runs)
+
+
+def test_non_numeric_ids_fall_back_to_exact_set():
+    seen = TransactionIdSet()
+    assert seen.add(pd.Series(["abc", "", None, "abc"])).tolist() == [False, False, False, True]
+    assert seen.add(pd.Series(["abc"])).tolist() == [True]
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from etl_clean import validate_chunk, validate_row
+
+
+ROWS = {
+    "email": ["a@b.co", "ü@b.co", "a@b.co\n", "", None, "a@b", "A.B@c.DE", "  "],
+    "quantity": ["2", " 3 ", "1e2", "nan", "-1", "abc", None, "12..5"],
+    "unit_price": ["10", "10", "1", "1", "1", "1", "1", ""],
+    "discount_percent": ["0", "10", "0", "0", "101", "-0", "", "50"],
+    "tax_rate": ["0", "20", "inf", "nan", "0", "x", "0", "0"],
+    "total_amount": ["20", "32.4", "100", "1", "-1", "1", "1", "1"],
+    "loyalty_points": ["1", "", "-5", None, "0", "1_0", "2", "3"],
+    "order_date": ["2021-01-01", "nan", "2021-02-30", "", None, "2021-1-1", "20210101", "2021-06-01"],
+}
+
+
+def test_matches_row_wise_validation():
+    df = pd.DataFrame(ROWS)
+    expected = df.apply(validate_row, axis=1).apply(";".join)
+    assert validate_chunk(df).tolist() == expected.tolist()
+
+
+def test_absent_columns_are_missing_values():
+    df = pd.DataFrame({"quantity": ["-1", "1"]})
+    assert validate_chunk(df).tolist() == ["INVALID_QUANTITY", ""]
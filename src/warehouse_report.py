@@ -0,0 +1,158 @@
+import argparse
+import os
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from load_to_warehouse import LAYOUTS, WarehouseLoader
+
+
+# API queries plus selective filters that zone maps can prune; "flat" is the
+# pre-star layout (one unsorted table, order_date as text).
+QUERIES = {
+    "revenue-by-country (API)": {
+        "flat": """
+            SELECT country, SUM(total_amount) AS revenue
+            FROM fact_transactions
+            GROUP BY country
+            ORDER BY revenue DESC
+        """,
+        "star": """
+            SELECT country, SUM(total_amount) AS revenue
+            FROM fact_transactions
+            GROUP BY country
+            ORDER BY revenue DESC
+        """,
+    },
+    "daily-revenue (API)": {
+        "flat": """
+            SELECT order_date, SUM(total_amount) AS revenue
+            FROM fact_transactions
+            GROUP BY order_date
+            ORDER BY order_date
+        """,
+        "star": """
+            SELECT d.date, f.revenue
+            FROM (
+                SELECT date_key, SUM(total_amount) AS revenue
+                FROM fact_transactions
+                GROUP BY date_key
+            ) f
+            JOIN dim_date d USING (date_key)
+            ORDER BY d.date
+        """,
+    },
+    "revenue, one week": {
+        "flat": """
+            SELECT SUM(total_amount) FROM fact_transactions
+            WHERE order_date BETWEEN '{week_start}' AND '{week_end}'
+        """,
+        "star": """
+            SELECT SUM(total_amount) FROM fact_transactions
+            WHERE date_key BETWEEN {week_start_key} AND {week_end_key}
+        """,
+    },
+    "revenue, one country + day": {
+        "flat": """
+            SELECT SUM(total_amount) FROM fact_transactions
+            WHERE order_date = '{week_start}' AND country = '{country}'
+        """,
+        "star": """
+            SELECT SUM(total_amount) FROM fact_transactions
+            WHERE date_key = {week_start_key} AND country = '{country}'
+        """,
+    },
+}
+
+
+def build(input_path: str, db: str, layout: str, chunksize: int) -> float:
+    if os.path.exists(db):
+        os.remove(db)
+    started = time.perf_counter()
+    con = duckdb.connect(db)
+    loader = WarehouseLoader(con, "fact_transactions", layout)
+    for df in pd.read_csv(input_path, dtype=str, chunksize=chunksize):
+        loader.append(df)
+    loader.commit()
+    con.execute("CHECKPOINT")
+    con.close()
+    return time.perf_counter() - started
+
+
+def time_query(db: str, sql: str, runs: int):
+    """Return (query ms, connect + query + close ms) arrays over `runs` runs.
+
+    The API opens a read-only connection per request, so both are reported;
+    the query-only time is what the layout changes.
+    """
+    query_ms = []
+    total_ms = []
+    for i in range(runs + 1):
+        started = time.perf_counter()
+        con = duckdb.connect(db, read_only=True)
+        query_started = time.perf_counter()
+        con.execute(sql).fetchall()
+        query_done = time.perf_counter()
+        con.close()
+        if i:  # first run warms the OS page cache
+            query_ms.append((query_done - query_started) * 1000)
+            total_ms.append((time.perf_counter() - started) * 1000)
+    return np.array(query_ms), np.array(total_ms)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Compare flat vs star warehouse layouts: size and query latency")
+    ap.add_argument("--input", default="data/clean/clean_transactions.csv")
+    ap.add_argument("--workdir", default="data/warehouse_report")
+    ap.add_argument("--chunksize", type=int, default=200_000)
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--week-start", default="2021-06-01")
+    ap.add_argument("--country", default="Germany")
+    args = ap.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    week_start = pd.Timestamp(args.week_start)
+    week_end = week_start + pd.Timedelta(days=6)
+    params = {
+        "week_start": week_start.strftime("%Y-%m-%d"),
+        "week_end": week_end.strftime("%Y-%m-%d"),
+        "week_start_key": week_start.strftime("%Y%m%d"),
+        "week_end_key": week_end.strftime("%Y%m%d"),
+        "country": args.country,
+    }
+
+    dbs = {}
+    print(f"{'layout':<8} {'build s':>9} {'file MB':>9} {'fact rows':>12}")
+    for layout in ["flat", "star"]:
+        db = os.path.join(args.workdir, f"{layout}.duckdb")
+        seconds = build(args.input, db, layout, args.chunksize)
+        con = duckdb.connect(db, read_only=True)
+        rows = con.execute("SELECT COUNT(*) FROM fact_transactions").fetchone()[0]
+        con.close()
+        print(f"{layout:<8} {seconds:>9.2f} {os.path.getsize(db) / 2**20:>9.2f} {rows:>12,}")
+        dbs[layout] = db
+
+    print(
+        f"\n{'query':<28} {'flat p50':>9} {'star p50':>9} {'flat p95':>9} {'star p95':>9} {'speedup':>8}"
+        f" {'flat req':>9} {'star req':>9}"
+    )
+    for name, variants in QUERIES.items():
+        stats = {}
+        for layout in LAYOUTS:
+            query_ms, total_ms = time_query(dbs[layout], variants[layout].format(**params), args.runs)
+            stats[layout] = (np.percentile(query_ms, 50), np.percentile(query_ms, 95), np.percentile(total_ms, 50))
+        speedup = stats["flat"][0] / stats["star"][0] if stats["star"][0] else float("nan")
+        print(
+            f"{name:<28} {stats['flat'][0]:>9.2f} {stats['star'][0]:>9.2f} "
+            f"{stats['flat'][1]:>9.2f} {stats['star'][1]:>9.2f} {speedup:>7.2f}x"
+            f" {stats['flat'][2]:>9.2f} {stats['star'][2]:>9.2f}"
+        )
+    print("\nms; p50/p95 are query-only, 'req' is p50 of connect + query + close as the API does per request")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())